@@ -5,12 +5,1081 @@ import sqlite3
 from datetime import datetime
 import os
 import csv
-from PIL import Image, ImageTk  # Now Pillow is properly installed
+import hashlib
+import heapq
+import queue
+import shutil
+import string
+import sys
+import threading
+import time
+import unicodedata
+from array import array
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from PIL import Image, ImageOps, ImageTk  # Now Pillow is properly installed
 
 # Set appearance mode and color theme
 ctk.set_appearance_mode("System")
 ctk.set_default_color_theme("blue")
 
+# The default contact book, always open
+DEFAULT_BOOK_NAME = 'Main'
+DEFAULT_BOOK_PATH = 'contacts.db'
+BOOK_SEARCH_WORKERS = 4
+
+# Idle-time maintenance: how often to look for idle books (milliseconds), how long
+# the user and the writer must have been quiet (seconds), and how often to ANALYZE
+MAINTENANCE_CHECK_MS = 60 * 1000
+MAINTENANCE_IDLE_SECONDS = 120
+ANALYZE_INTERVAL_SECONDS = 24 * 60 * 60
+ANALYSIS_LIMIT = 1000
+INCREMENTAL_VACUUM_PAGES = 2000
+
+# Change detection: how often each book is polled (milliseconds), how many changed
+# contacts are patched into the list before a full reload is cheaper, and how many
+# change log entries maintenance keeps
+WATCH_INTERVAL_MS = 1000
+WATCH_MAX_CHANGES = 500
+CHANGE_LOG_KEEP = 10000
+
+# Returned by ContactBook.poll_changes when the changes cannot be applied row by row
+RELOAD_ALL = 'reload'
+
+# Contacts created within this many seconds count as recent on the dashboard
+RECENT_CONTACT_SECONDS = 7 * 24 * 60 * 60
+
+# Upper bound for the memory held by cached search results (bytes)
+SEARCH_CACHE_MAX_BYTES = 8 * 1024 * 1024
+
+# SQLite's LOWER() and LIKE only fold ASCII letters
+ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+# Fuzzy search stops ranking candidates after this many seconds
+FUZZY_TIME_BUDGET = 0.15
+FUZZY_MAX_RESULTS = 200
+
+# Writer thread settings: how long SQLite waits on a locked database (seconds),
+# how often a locked batch is retried, and how many queued writes share a commit
+DB_BUSY_TIMEOUT = 5.0
+DB_WRITE_RETRIES = 3
+DB_RETRY_DELAY = 0.5
+DB_MAX_BATCH = 64
+
+# How often the UI checks pending writes (milliseconds)
+WRITE_POLL_MS = 50
+
+# Contact photos live in a content-addressed directory next to the database: photos/
+# for the default book, <name>_photos for every other book and backup
+PHOTO_STORE_DIR = 'photos'
+LIST_THUMBNAIL_SIZE = (32, 32)
+FORM_THUMBNAIL_SIZE = (96, 96)
+PHOTO_PRUNE_GRACE_SECONDS = 60 * 60
+THUMBNAIL_CACHE_MAX_BYTES = 16 * 1024 * 1024
+THUMBNAIL_POLL_MS = 30
+TREE_IMAGE_LIMIT = 256
+
+class SearchCache:
+    """LRU cache of search term -> matching contact rows, bounded by memory"""
+
+    def __init__(self, max_bytes=SEARCH_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.generation = 0
+        self.total_bytes = 0
+        self.entries = OrderedDict()  # term -> (generation, rows, size)
+
+    def invalidate(self):
+        """Bump the write generation so every cached result becomes stale"""
+        self.generation += 1
+        self.entries.clear()
+        self.total_bytes = 0
+
+    def get(self, term):
+        """Return cached rows for term, or None if missing or stale"""
+        entry = self.entries.get(term)
+        if entry is None:
+            return None
+        if entry[0] != self.generation:
+            self._discard(term)
+            return None
+        self.entries.move_to_end(term)
+        return entry[1]
+
+    def refine(self, term):
+        """Derive rows for term by filtering the longest cached sub-term in memory"""
+        # LIKE treats % and _ as wildcards, plain substring matching does not
+        if '%' in term or '_' in term:
+            return None
+
+        best = None
+        for cached_term in list(self.entries):
+            if cached_term in term and (best is None or len(cached_term) > len(best)):
+                if '%' in cached_term or '_' in cached_term:
+                    continue
+                if self.entries[cached_term][0] != self.generation:
+                    self._discard(cached_term)
+                    continue
+                best = cached_term
+
+        if best is None:
+            return None
+
+        self.entries.move_to_end(best)
+        return [row for row in self.entries[best][1] if self.row_matches(row, term)]
+
+    def put(self, term, rows):
+        """Store rows for term, evicting least recently used entries as needed"""
+        size = self._estimate_size(term, rows)
+        if size > self.max_bytes:
+            return
+        if term in self.entries:
+            self._discard(term)
+
+        self.entries[term] = (self.generation, rows, size)
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes:
+            oldest = next(iter(self.entries))
+            self._discard(oldest)
+
+    @staticmethod
+    def row_matches(row, term):
+        """Mirror the WHERE clause of search_contacts for a fetched row"""
+        # row: id, first_name, last_name, phone, email, company, category, photo, book
+        for value in (row[1], row[2], row[3], row[4], row[5]):
+            if value and term in value.translate(ASCII_LOWER):
+                return True
+        return False
+
+    def _discard(self, term):
+        entry = self.entries.pop(term)
+        self.total_bytes -= entry[2]
+
+    @staticmethod
+    def _estimate_size(term, rows):
+        # Counts every row in full even when shared with another entry,
+        # so the real footprint stays below the configured bound
+        size = sys.getsizeof(term) + sys.getsizeof(rows)
+        for row in rows:
+            size += sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+        return size
+
+class FuzzyNameIndex:
+    """Trigram index over normalized first/last name and company tokens"""
+
+    def __init__(self, time_budget=FUZZY_TIME_BUDGET):
+        self.time_budget = time_budget
+        self.ready = False
+        self.grams = {}           # trigram -> set of tokens
+        self.token_ids = {}       # token -> set of contact ids
+        self.contact_tokens = {}  # contact id -> tuple of tokens
+
+    @staticmethod
+    def normalize(text):
+        """Lowercase, strip accents and split text into alphanumeric tokens"""
+        if not text:
+            return []
+        text = unicodedata.normalize('NFKD', text.casefold())
+        text = ''.join(ch if ch.isalnum() else ' ' for ch in text
+                       if not unicodedata.combining(ch))
+        return text.split()
+
+    @staticmethod
+    def trigrams(token):
+        """Return the set of padded trigrams of a token"""
+        padded = f"  {token}  "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    @staticmethod
+    def max_distance(token):
+        """Number of typos tolerated for a token of this length"""
+        if len(token) <= 4:
+            return 1
+        if len(token) <= 8:
+            return 2
+        return 3
+
+    @staticmethod
+    def edit_distance(a, b, limit):
+        """Levenshtein distance between a and b, or limit + 1 once it exceeds limit"""
+        if abs(len(a) - len(b)) > limit:
+            return limit + 1
+        previous = list(range(len(b) + 1))
+        for i, ca in enumerate(a, 1):
+            current = [i]
+            for j, cb in enumerate(b, 1):
+                current.append(min(previous[j] + 1, current[j - 1] + 1,
+                                   previous[j - 1] + (ca != cb)))
+            if min(current) > limit:
+                return limit + 1
+            previous = current
+        return previous[-1]
+
+    def build(self, rows):
+        """Index (id, first_name, last_name, company) rows from scratch"""
+        self.clear()
+        for contact_id, first_name, last_name, company in rows:
+            self.add(contact_id, first_name, last_name, company)
+        self.ready = True
+
+    def clear(self):
+        """Drop every indexed contact"""
+        self.grams.clear()
+        self.token_ids.clear()
+        self.contact_tokens.clear()
+
+    def add(self, contact_id, first_name, last_name, company):
+        """Index a single contact, replacing any previous entry for it"""
+        self.remove(contact_id)
+        tokens = tuple(dict.fromkeys(self.normalize(first_name) + self.normalize(last_name)
+                                     + self.normalize(company)))
+        if not tokens:
+            return
+        self.contact_tokens[contact_id] = tokens
+        for token in tokens:
+            ids = self.token_ids.get(token)
+            if ids is None:
+                ids = self.token_ids[token] = set()
+                for gram in self.trigrams(token):
+                    self.grams.setdefault(gram, set()).add(token)
+            ids.add(contact_id)
+
+    def remove(self, contact_id):
+        """Remove a contact from the index if present"""
+        tokens = self.contact_tokens.pop(contact_id, ())
+        for token in tokens:
+            ids = self.token_ids[token]
+            ids.discard(contact_id)
+            if ids:
+                continue
+            # Last contact using this token, drop it from the vocabulary
+            del self.token_ids[token]
+            for gram in self.trigrams(token):
+                bucket = self.grams[gram]
+                bucket.discard(token)
+                if not bucket:
+                    del self.grams[gram]
+
+    def search(self, query, limit=FUZZY_MAX_RESULTS):
+        """Return [(contact_id, distance)] ranked by total edit distance"""
+        query_tokens = self.normalize(query)
+        if not query_tokens:
+            return []
+        start = time.perf_counter()
+
+        scores = None
+        for position, query_token in enumerate(query_tokens, 1):
+            # Each word gets its share of the budget plus whatever earlier words left over
+            deadline = start + self.time_budget * position / len(query_tokens)
+            token_scores, complete = self._match_token(query_token, deadline)
+            if scores is None:
+                narrowed = token_scores
+            else:
+                # Every query token has to match some token of the contact
+                narrowed = {contact_id: distance + token_scores[contact_id]
+                            for contact_id, distance in scores.items()
+                            if contact_id in token_scores}
+            if narrowed or complete:
+                scores = narrowed
+            # A word cut short by the deadline cannot rule contacts out, it is skipped instead
+            if scores is not None and not scores:
+                return []
+
+        if scores is None:
+            return []
+        return heapq.nsmallest(limit, scores.items(), key=lambda item: (item[1], item[0]))
+
+    def _match_token(self, query_token, deadline):
+        """Return (contact id -> smallest distance to query_token, whether every candidate was checked)"""
+        limit = self.max_distance(query_token)
+        query_grams = self.trigrams(query_token)
+
+        # Exact matches cost nothing and must survive the deadline
+        matches = dict.fromkeys(self.token_ids.get(query_token, ()), 0)
+
+        # Each edit destroys at most three trigrams, so close tokens share the rest
+        overlap = Counter()
+        for gram in query_grams:
+            overlap.update(self.grams.get(gram, ()))
+        min_shared = max(1, len(query_grams) - 3 * limit)
+
+        for token, shared in overlap.most_common():
+            if shared < min_shared:
+                break
+            if time.perf_counter() > deadline:
+                return matches, False
+            if token == query_token:
+                continue
+            distance = self.edit_distance(query_token, token, limit)
+            if distance > limit:
+                continue
+            for contact_id in self.token_ids[token]:
+                if distance < matches.get(contact_id, limit + 1):
+                    matches[contact_id] = distance
+        return matches, True
+
+class ContactStats:
+    """Dashboard figures of a book, kept current from changed contacts instead of rescanning"""
+
+    def __init__(self):
+        self.ready = False
+        self.clear()
+
+    def clear(self):
+        """Forget every counted contact"""
+        self.total = 0
+        self.category_of = array('I')     # contact id -> category code, 0 when absent
+        self.created_at = array('L')      # contact id -> creation time (Unix seconds)
+        self.category_codes = {'': 1}     # category -> code, 1 means no category
+        self.category_counts = Counter()  # code -> contacts
+        self.recent = Counter()           # creation time -> contacts, recent ones only
+
+    def build(self, rows):
+        """Count (id, category, created) rows from scratch"""
+        self.clear()
+        for contact_id, category, created in rows:
+            self.add(contact_id, category, created)
+        self.ready = True
+
+    def add(self, contact_id, category, created):
+        """Count a contact, replacing any previous entry for it"""
+        self.remove(contact_id)
+        if contact_id >= len(self.category_of):
+            grow = contact_id + 1 - len(self.category_of) + len(self.category_of) // 2
+            self.category_of.extend(array('I', [0]) * grow)
+            self.created_at.extend(array('L', [0]) * grow)
+
+        code = self.category_codes.setdefault(category or '', len(self.category_codes) + 1)
+        self.category_of[contact_id] = code
+        self.created_at[contact_id] = created or 0
+        self.category_counts[code] += 1
+        self.total += 1
+        if created and created >= int(time.time()) - RECENT_CONTACT_SECONDS:
+            self.recent[created] += 1
+
+    def remove(self, contact_id):
+        """Stop counting a contact if it is counted"""
+        if contact_id >= len(self.category_of) or not self.category_of[contact_id]:
+            return
+        code = self.category_of[contact_id]
+        self.category_counts[code] -= 1
+        if not self.category_counts[code]:
+            del self.category_counts[code]
+        created = self.created_at[contact_id]
+        if created in self.recent:
+            self.recent[created] -= 1
+            if not self.recent[created]:
+                del self.recent[created]
+        self.category_of[contact_id] = 0
+        self.total -= 1
+
+    def summary(self):
+        """Return total, recent and the set of categories"""
+        # Contacts age out of the recent window, they never come back into it
+        cutoff = int(time.time()) - RECENT_CONTACT_SECONDS
+        for created in [created for created in self.recent if created < cutoff]:
+            del self.recent[created]
+        categories = {category for category, code in self.category_codes.items()
+                      if category and code in self.category_counts}
+        return {'total': self.total, 'recent': sum(self.recent.values()), 'categories': categories}
+
+class DatabaseWriter:
+    """Dedicated thread that owns the write connection and group-commits queued writes"""
+
+    def __init__(self, path, busy_timeout=DB_BUSY_TIMEOUT, retries=DB_WRITE_RETRIES,
+                 retry_delay=DB_RETRY_DELAY, max_batch=DB_MAX_BATCH):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.max_batch = max_batch
+        self.queue = queue.Queue()
+        self.last_write = time.monotonic()
+        self.thread = threading.Thread(target=self._run, name="contacts-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, operation):
+        """Queue operation(cursor) to run in a write transaction and return a Future"""
+        future = Future()
+        self.queue.put((operation, future, True))
+        return future
+
+    def submit_maintenance(self, operation):
+        """Queue operation(cursor) to run on its own, outside any transaction (e.g. VACUUM)"""
+        future = Future()
+        self.queue.put((operation, future, False))
+        return future
+
+    def idle_for(self):
+        """Seconds since the last write, or 0 while writes are queued"""
+        if not self.queue.empty():
+            return 0
+        return time.monotonic() - self.last_write
+
+    def close(self):
+        """Finish queued writes and stop the writer thread"""
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+
+    def _run(self):
+        # isolation_level=None leaves transaction control to _commit_batch
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+        try:
+            running = True
+            while running:
+                item = self.queue.get()
+                if item is None:
+                    break
+                if not item[2]:
+                    self._run_alone(conn, item)
+                    continue
+                batch = [item]
+                pending = None
+                # Coalesce whatever else is already waiting into the same commit
+                while len(batch) < self.max_batch:
+                    try:
+                        item = self.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        running = False
+                        break
+                    if not item[2]:
+                        pending = item
+                        break
+                    batch.append(item)
+                self._commit_batch(conn, batch)
+                if pending:
+                    self._run_alone(conn, pending)
+        finally:
+            conn.close()
+
+    def _commit_batch(self, conn, batch):
+        for attempt in range(self.retries + 1):
+            outcomes = []
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                cursor = conn.cursor()
+                for operation, future, _ in batch:
+                    # A savepoint per write lets one failure leave the others intact
+                    conn.execute('SAVEPOINT write_op')
+                    try:
+                        outcomes.append((future, operation(cursor), None))
+                        conn.execute('RELEASE write_op')
+                    except Exception as e:
+                        if self._is_busy(e):
+                            raise
+                        conn.execute('ROLLBACK TO write_op')
+                        conn.execute('RELEASE write_op')
+                        outcomes.append((future, None, e))
+                conn.execute('COMMIT')
+                break
+            except sqlite3.Error as e:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                if not self._is_busy(e) or attempt == self.retries:
+                    outcomes = [(future, None, e) for _, future, _ in batch]
+                    break
+                time.sleep(self.retry_delay * (attempt + 1))
+
+        self.last_write = time.monotonic()
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    def _run_alone(self, conn, item):
+        operation, future, _ = item
+        for attempt in range(self.retries + 1):
+            try:
+                result = operation(conn.cursor())
+            except Exception as e:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                if self._is_busy(e) and attempt < self.retries:
+                    time.sleep(self.retry_delay * (attempt + 1))
+                    continue
+                future.set_exception(e)
+                return
+            future.set_result(result)
+            return
+
+    @staticmethod
+    def _is_busy(error):
+        message = str(error)
+        return isinstance(error, sqlite3.OperationalError) and (
+            'database is locked' in message or 'database is busy' in message)
+
+class ContactBook:
+    """A single contacts database with its own read connection, writer thread and fuzzy index"""
+
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+
+        # This connection only reads once the writer thread is running
+        self.conn = sqlite3.connect(path, timeout=DB_BUSY_TIMEOUT, check_same_thread=False)
+        try:
+            self.cursor = self.conn.cursor()
+            self.create_schema()
+        except sqlite3.Error:
+            # Not a contact book (or not a database at all), do not leak the connection
+            self.conn.close()
+            raise
+
+        # All writes go through a single writer thread
+        self.writer = DatabaseWriter(path)
+
+        # Photos of this book, idle maintenance deletes the ones no contact uses any more
+        self.photos = PhotoStore(self.photo_dir(path))
+
+        # Typo-tolerant name index, built in the background the first time fuzzy search is used.
+        # Contacts written while a build runs are re-indexed once it finishes
+        self.fuzzy_index = FuzzyNameIndex()
+        self.fuzzy_build = None
+        self.fuzzy_dirty = set()
+        self.fuzzy_stale = False
+
+        # Dashboard figures, counted once and then kept current by change detection
+        self.contact_stats = ContactStats()
+
+        # Where change detection left off
+        self.data_version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+        self.change_seq = self.conn.execute('SELECT MAX(seq) FROM contact_changes').fetchone()[0] or 0
+
+        # When idle maintenance last ran ANALYZE, what it reported, and the change log
+        # position it saw, a book nobody wrote to since is skipped unless unused photos
+        # were kept for their grace period
+        self.last_analyze = None
+        self.maintenance_pending = False
+        self.last_maintenance = None
+        self.maintained_seq = None
+        self.prune_due = None
+
+    @staticmethod
+    def photo_dir(path):
+        """Photo store directory of the database at path"""
+        if path == DEFAULT_BOOK_PATH:
+            return PHOTO_STORE_DIR
+        return f"{os.path.splitext(path)[0]}_{PHOTO_STORE_DIR}"
+
+    def create_schema(self):
+        """Create the tables of a contact book if they do not exist yet"""
+        # Only takes effect on a brand-new file, existing books are converted
+        # by the first idle maintenance run
+        self.cursor.execute('PRAGMA auto_vacuum=INCREMENTAL')
+
+        # WAL lets the UI keep reading while the writer thread commits
+        self.cursor.execute('PRAGMA journal_mode=WAL')
+
+        self.create_tables(self.cursor)
+        self.conn.commit()
+
+    @staticmethod
+    def create_tables(cursor):
+        """Create the contacts and contact_photos tables through cursor"""
+        # Create contacts table if not exists
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS contacts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                first_name TEXT NOT NULL,
+                last_name TEXT NOT NULL,
+                phone TEXT,
+                email TEXT,
+                address TEXT,
+                company TEXT,
+                notes TEXT,
+                category TEXT,
+                created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_modified TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Photos are kept out of the contacts row, only their content digest is stored
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS contact_photos (
+                contact_id INTEGER PRIMARY KEY REFERENCES contacts(id),
+                sha256 TEXT NOT NULL,
+                added_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Every write, from this app or any other process, logs the contact it touched
+        # so open windows can fetch just those rows. A NULL contact_id means "reload all"
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS contact_changes (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                contact_id INTEGER,
+                changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        for table, key in (('contacts', 'id'), ('contact_photos', 'contact_id')):
+            for event, row in (('INSERT', 'NEW'), ('UPDATE', 'NEW'), ('DELETE', 'OLD')):
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS log_{table}_{event.lower()}
+                    AFTER {event} ON {table}
+                    BEGIN
+                        INSERT INTO contact_changes (contact_id) VALUES ({row}.{key});
+                    END
+                ''')
+
+    def list_contacts(self, search_term=None):
+        """Return list rows sorted by name, optionally filtered by search_term"""
+        # Runs on a search worker thread, so it does not share self.cursor
+        query = '''
+            SELECT contacts.id, first_name, last_name, phone, email, company, category, photo.sha256, ?
+            FROM contacts
+            LEFT JOIN contact_photos AS photo ON photo.contact_id = contacts.id
+        '''
+        params = [self.name]
+        if search_term:
+            query += '''
+            WHERE LOWER(first_name) LIKE ? OR LOWER(last_name) LIKE ? OR phone LIKE ? OR LOWER(email) LIKE ? OR LOWER(company) LIKE ?
+            '''
+            params += [f'%{search_term}%'] * 5
+        query += 'ORDER BY first_name, last_name'
+        return self.conn.execute(query, params).fetchall()
+
+    def fuzzy_contacts(self, search_term):
+        """Return (distance, row) pairs for contacts within a few typos of search_term"""
+        distances = dict(self.fuzzy_index.search(search_term))
+        return [(distances[row[0]], row) for row in self.fetch_contacts(list(distances))]
+
+    def build_fuzzy_index(self):
+        """Start building a fresh fuzzy index on a background thread and return its Future"""
+        self.fuzzy_dirty = set()
+        self.fuzzy_stale = False
+        self.fuzzy_build = Future()
+        threading.Thread(target=self._build_fuzzy_index, args=(self.fuzzy_build,),
+                         name="fuzzy-index", daemon=True).start()
+        return self.fuzzy_build
+
+    def _build_fuzzy_index(self, future):
+        try:
+            # A connection of its own reads a consistent snapshot while the UI keeps querying
+            conn = sqlite3.connect(self.path, timeout=DB_BUSY_TIMEOUT)
+            try:
+                rows = conn.execute('SELECT id, first_name, last_name, company FROM contacts').fetchall()
+            finally:
+                conn.close()
+            index = FuzzyNameIndex()
+            index.build(rows)
+            future.set_result(index)
+        except Exception as e:
+            future.set_exception(e)
+
+    def install_fuzzy_index(self, index):
+        """Swap in a finished index, or return False if the book changed too much while it was built"""
+        self.fuzzy_build = None
+        if self.fuzzy_stale:
+            return False
+
+        # Catch up with contacts written since the build read its snapshot
+        dirty_ids = list(self.fuzzy_dirty)
+        self.fuzzy_dirty = set()
+        for contact_id in dirty_ids:
+            index.remove(contact_id)
+        for contact in self.fetch_contacts(dirty_ids):
+            index.add(contact[0], contact[1], contact[2], contact[5])
+        self.fuzzy_index = index
+        return True
+
+    def index_contact(self, contact_id, first_name, last_name, company):
+        """Keep the fuzzy index in step with a written contact"""
+        if self.fuzzy_build is not None:
+            self.fuzzy_dirty.add(contact_id)
+        if self.fuzzy_index.ready:
+            self.fuzzy_index.add(contact_id, first_name, last_name, company)
+
+    def unindex_contact(self, contact_id):
+        """Drop a deleted contact from the fuzzy index"""
+        if self.fuzzy_build is not None:
+            self.fuzzy_dirty.add(contact_id)
+        self.fuzzy_index.remove(contact_id)
+
+    def clear_fuzzy_index(self):
+        """Empty the fuzzy index after every contact was deleted"""
+        if self.fuzzy_build is not None:
+            self.fuzzy_stale = True
+        self.fuzzy_index.clear()
+
+    def fetch_contacts(self, ids):
+        """Return list rows for the given contact ids, missing ids are skipped"""
+        # Fetch rows in chunks to stay under SQLite's variable limit
+        results = []
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ','.join('?' for _ in chunk)
+            rows = self.conn.execute(f'''
+                SELECT contacts.id, first_name, last_name, phone, email, company, category, photo.sha256, ?
+                FROM contacts
+                LEFT JOIN contact_photos AS photo ON photo.contact_id = contacts.id
+                WHERE contacts.id IN ({placeholders})
+            ''', [self.name] + chunk)
+            results.extend(rows)
+        return results
+
+    def poll_changes(self):
+        """Return None when nothing changed since the last poll, RELOAD_ALL, or (rows, deleted_ids)"""
+        # Answered from the WAL index, no table is read while the book is idle
+        version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+        if version == self.data_version:
+            return None
+        self.data_version = version
+
+        first_seq, last_seq = self.conn.execute('SELECT MIN(seq), MAX(seq) FROM contact_changes').fetchone()
+        last_seq = last_seq or 0
+        previous_seq = self.change_seq
+        self.change_seq = last_seq
+        if last_seq == previous_seq:
+            return None
+        # The log was rewound (restored file) or pruned past our position
+        if last_seq < previous_seq or (first_seq or 0) > previous_seq + 1:
+            return RELOAD_ALL
+
+        ids = [row[0] for row in self.conn.execute('''
+            SELECT DISTINCT contact_id FROM contact_changes
+            WHERE seq > ? AND seq <= ?
+            LIMIT ?
+        ''', (previous_seq, last_seq, WATCH_MAX_CHANGES + 1))]
+        if None in ids or len(ids) > WATCH_MAX_CHANGES:
+            return RELOAD_ALL
+
+        rows = self.fetch_contacts(ids)
+        deleted_ids = set(ids) - {row[0] for row in rows}
+        return rows, deleted_ids
+
+    def stats(self):
+        """Return total, recent (last 7 days) and the set of categories of this book"""
+        if not self.contact_stats.ready:
+            self.contact_stats.build(self.conn.execute('''
+                SELECT id, category, CAST(strftime('%s', created_date) AS INTEGER) FROM contacts
+            '''))
+        return self.contact_stats.summary()
+
+    def update_stats(self, ids):
+        """Recount the given contacts after change detection reported them"""
+        if not self.contact_stats.ready:
+            return
+        ids = list(ids)
+        for contact_id in ids:
+            self.contact_stats.remove(contact_id)
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ','.join('?' for _ in chunk)
+            for row in self.conn.execute(f'''
+                SELECT id, category, CAST(strftime('%s', created_date) AS INTEGER) FROM contacts
+                WHERE id IN ({placeholders})
+            ''', chunk):
+                self.contact_stats.add(*row)
+
+    def backup(self):
+        """Write a consistent copy of this book next to it and return the file name"""
+        stem = os.path.splitext(self.path)[0]
+        backup_filename = f"{stem}_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
+
+        # Online backup, consistent even while the writer thread is committing
+        backup_conn = sqlite3.connect(backup_filename)
+        try:
+            self.conn.backup(backup_conn)
+            digests = [row[0] for row in backup_conn.execute('SELECT DISTINCT sha256 FROM contact_photos')]
+        finally:
+            backup_conn.close()
+
+        # The photos the copy refers to go to its own store, so it opens as a book with photos
+        self.photos.copy_to(PhotoStore(self.photo_dir(backup_filename)), digests)
+        return backup_filename
+
+    def reset(self, cursor):
+        """Drop and recreate the tables instead of deleting row by row (writer thread)"""
+        # Dropping forgets the AUTOINCREMENT counter, put it back so ids of old
+        # exports and backups are never handed out again
+        sequence = cursor.execute("SELECT seq FROM sqlite_sequence WHERE name='contacts'").fetchone()
+        cursor.execute('DROP TABLE IF EXISTS contact_photos')
+        cursor.execute('DROP TABLE IF EXISTS contacts')
+        self.create_tables(cursor)
+        if sequence:
+            cursor.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('contacts', ?)", sequence)
+        # DROP TABLE fires no delete triggers, tell other windows to reload
+        cursor.execute('INSERT INTO contact_changes (contact_id) VALUES (NULL)')
+
+    def maintain(self, cursor, analyze=False):
+        """Reclaim free pages and refresh planner statistics (writer thread, no transaction)"""
+        if cursor.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+            # One-off rebuild, auto_vacuum can only change through VACUUM
+            cursor.execute('PRAGMA auto_vacuum=INCREMENTAL')
+            cursor.execute('VACUUM')
+        elif cursor.execute('PRAGMA freelist_count').fetchone()[0]:
+            # Frees one page per step, fetchall drives it to completion
+            cursor.execute(f'PRAGMA incremental_vacuum({INCREMENTAL_VACUUM_PAGES})').fetchall()
+
+        # Windows that fall behind the kept entries reload everything instead
+        cursor.execute('''
+            DELETE FROM contact_changes
+            WHERE seq <= (SELECT MAX(seq) FROM contact_changes) - ?
+        ''', (CHANGE_LOG_KEEP,))
+
+        # Photos left behind by deleted contacts, removed photos and resets
+        referenced = {row[0] for row in cursor.execute('SELECT DISTINCT sha256 FROM contact_photos')}
+        deferred = self.photos.prune(referenced)
+
+        if analyze:
+            # Sample instead of scanning every row of large tables
+            cursor.execute(f'PRAGMA analysis_limit={ANALYSIS_LIMIT}')
+            cursor.execute('ANALYZE')
+        else:
+            cursor.execute('PRAGMA optimize')
+        stats = self.storage_stats(cursor)
+        stats['photos_deferred'] = deferred
+        return stats
+
+    def check(self):
+        """Run quick_check and collect storage statistics on a connection of its own"""
+        # Both only read, queued saves keep going on the writer thread meanwhile
+        conn = sqlite3.connect(self.path, timeout=DB_BUSY_TIMEOUT)
+        try:
+            cursor = conn.cursor()
+            problems = [row[0] for row in cursor.execute('PRAGMA quick_check')]
+            stats = self.storage_stats(cursor)
+            stats['quick_check'] = problems
+            stats['fragmentation'] = self.fragmentation(cursor)
+        finally:
+            conn.close()
+        return stats
+
+    @staticmethod
+    def storage_stats(cursor):
+        """Page counts and sizes of the database behind cursor"""
+        page_size = cursor.execute('PRAGMA page_size').fetchone()[0]
+        page_count = cursor.execute('PRAGMA page_count').fetchone()[0]
+        freelist_count = cursor.execute('PRAGMA freelist_count').fetchone()[0]
+        auto_vacuum = cursor.execute('PRAGMA auto_vacuum').fetchone()[0]
+        return {
+            'page_size': page_size,
+            'page_count': page_count,
+            'freelist_count': freelist_count,
+            'size_bytes': page_size * page_count,
+            'free_bytes': page_size * freelist_count,
+            'free_ratio': freelist_count / page_count if page_count else 0.0,
+            'auto_vacuum': ('none', 'full', 'incremental')[auto_vacuum],
+        }
+
+    @staticmethod
+    def fragmentation(cursor):
+        """Share of b-tree pages not stored right after their predecessor, None without dbstat"""
+        try:
+            rows = cursor.execute('SELECT name, pageno FROM dbstat ORDER BY name, path')
+        except sqlite3.OperationalError:
+            return None
+        total = out_of_order = 0
+        previous_name = previous_page = None
+        for name, pageno in rows:
+            if name == previous_name and pageno != previous_page + 1:
+                out_of_order += 1
+            total += 1
+            previous_name, previous_page = name, pageno
+        return out_of_order / total if total else 0.0
+
+    def close(self):
+        """Finish pending writes and close the connections"""
+        self.writer.close()
+        self.conn.close()
+
+class PhotoStore:
+    """Content-addressed store for contact photos, keyed by SHA-256 of the file"""
+
+    def __init__(self, root_dir=PHOTO_STORE_DIR):
+        self.root_dir = root_dir
+        self.thumbs_dir = os.path.join(root_dir, 'thumbs')
+        self.pinned = Counter()  # digest -> writes referring to it that have not committed yet
+        self.lock = threading.Lock()
+
+    def add(self, source_path):
+        """Copy an image into the store and return its digest, pinned until unpin(digest)"""
+        # Reject anything Pillow cannot read before it reaches the store
+        with Image.open(source_path) as image:
+            image.verify()
+
+        with open(source_path, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+
+        # Pinned before the file is written, so prune cannot remove it under a pending write
+        with self.lock:
+            self.pinned[digest] += 1
+        try:
+            self._write(self.path(digest), data)
+        except Exception:
+            self.unpin(digest)
+            raise
+        return digest
+
+    def unpin(self, digest):
+        """Allow prune to remove digest again once the write referring to it is done"""
+        with self.lock:
+            self.pinned[digest] -= 1
+            if self.pinned[digest] <= 0:
+                del self.pinned[digest]
+
+    def copy_to(self, other, digests):
+        """Copy the full-size images of digests into another store"""
+        for digest in digests:
+            path = self.path(digest)
+            if os.path.exists(path) and not os.path.exists(other.path(digest)):
+                os.makedirs(os.path.dirname(other.path(digest)), exist_ok=True)
+                shutil.copy2(path, other.path(digest))
+
+    def prune(self, referenced, grace=PHOTO_PRUNE_GRACE_SECONDS):
+        """Delete unused images and thumbnails, return how many were kept for being recently written"""
+        if not os.path.isdir(self.root_dir):
+            return 0
+        # Pins only cover this process, another instance may be between add() and its commit
+        cutoff = time.time() - grace
+        deferred = 0
+        for prefix in os.listdir(self.root_dir):
+            folder = os.path.join(self.root_dir, prefix)
+            if folder == self.thumbs_dir or not os.path.isdir(folder):
+                continue
+            for name in os.listdir(folder):
+                # Leftover .tmp files of interrupted copies go as well
+                digest = name.split('.')[0]
+                if digest not in referenced:
+                    deferred += not self._remove_unpinned(digest, os.path.join(folder, name), cutoff)
+
+        if os.path.isdir(self.thumbs_dir):
+            for name in os.listdir(self.thumbs_dir):
+                digest = name.split('_')[0]
+                if digest not in referenced:
+                    deferred += not self._remove_unpinned(digest, os.path.join(self.thumbs_dir, name), cutoff)
+        return deferred
+
+    @staticmethod
+    def _write(path, data):
+        if os.path.exists(path):
+            # Stored again, restart its grace period so no prune removes it before the commit
+            os.utime(path)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    def _remove_unpinned(self, digest, path, cutoff):
+        with self.lock:
+            if digest in self.pinned:
+                return False
+            try:
+                if os.path.getmtime(path) >= cutoff:
+                    return False
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return True
+
+    def path(self, digest):
+        """Location of the full-size image for digest"""
+        return os.path.join(self.root_dir, digest[:2], digest)
+
+    def thumbnail_path(self, digest, size):
+        """Location of the persisted thumbnail of digest at size"""
+        return os.path.join(self.thumbs_dir, f"{digest}_{size[0]}x{size[1]}.png")
+
+class ThumbnailCache:
+    """Decodes thumbnails on a background thread into a size-bounded LRU"""
+
+    def __init__(self, root, max_bytes=THUMBNAIL_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.images = OrderedDict()  # (source, size) -> PIL image
+        self.failed = set()          # (source, size) that could not be decoded
+        self.waiting = {}            # (source, size) -> callbacks
+        self.results = queue.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="thumbnails")
+
+    def request(self, source_path, size, callback, cache_path=None):
+        """Call callback(image) on the Tk thread once the thumbnail is decoded, or callback(None)"""
+        key = (source_path, size)
+        image = self.images.get(key)
+        if image is not None:
+            self.images.move_to_end(key)
+            callback(image)
+            return
+        if key in self.failed:
+            callback(None)
+            return
+
+        if key in self.waiting:
+            self.waiting[key].append(callback)
+            return
+        if not self.waiting:
+            self.root.after(THUMBNAIL_POLL_MS, self._deliver)
+        self.waiting[key] = [callback]
+        self.executor.submit(self._decode, key, cache_path)
+
+    def forget(self, source_path):
+        """Try decoding source_path again, e.g. after a missing photo was stored again"""
+        self.failed = {key for key in self.failed if key[0] != source_path}
+
+    def close(self):
+        """Stop decoding queued thumbnails"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _decode(self, key, cache_path):
+        # Runs on a worker thread, never touches Tk
+        source_path, size = key
+        image = None
+        try:
+            if cache_path and os.path.exists(cache_path):
+                with Image.open(cache_path) as cached:
+                    image = cached.convert('RGBA')
+            else:
+                with Image.open(source_path) as full:
+                    # Lets JPEG decode at a reduced scale instead of full size
+                    full.draft('RGB', size)
+                    image = ImageOps.exif_transpose(full).convert('RGBA')
+                image.thumbnail(size)
+                if cache_path:
+                    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                    temp_path = f"{cache_path}.tmp"
+                    image.save(temp_path, format='PNG')
+                    os.replace(temp_path, cache_path)
+        except Exception as e:
+            print(f"Error decoding thumbnail {source_path}: {e}")
+            image = None
+        self.results.put((key, image))
+
+    def _deliver(self):
+        while True:
+            try:
+                key, image = self.results.get_nowait()
+            except queue.Empty:
+                break
+            callbacks = self.waiting.pop(key, [])
+            if image is None:
+                # Unreadable or missing files are not decoded again on every scroll
+                self.failed.add(key)
+            else:
+                self._store(key, image)
+            for callback in callbacks:
+                callback(image)
+
+        if self.waiting:
+            self.root.after(THUMBNAIL_POLL_MS, self._deliver)
+
+    def _store(self, key, image):
+        size = image.width * image.height * 4
+        if key in self.images:
+            old = self.images.pop(key)
+            self.total_bytes -= old.width * old.height * 4
+        self.images[key] = image
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes and len(self.images) > 1:
+            _, old = self.images.popitem(last=False)
+            self.total_bytes -= old.width * old.height * 4
+
 class ContactManagementSystem:
     def __init__(self):
         self.root = ctk.CTk()
@@ -24,12 +1093,27 @@ class ContactManagementSystem:
         # Initialize database
         self.init_database()
         
+        # Cache of recent search results, invalidated on every write
+        self.search_cache = SearchCache()
+        
+        # Thumbnails of contact photos, decoded in the background
+        self.thumbnail_cache = ThumbnailCache(self.root)
+        
         # Setup GUI
         self.setup_gui()
         
         # Load contacts
         self.load_contacts()
         
+        # Database maintenance runs once the user has left the app alone for a while
+        self.last_activity = time.monotonic()
+        self.root.bind_all("<Any-KeyPress>", self.note_activity, add="+")
+        self.root.bind_all("<Any-ButtonPress>", self.note_activity, add="+")
+        self.root.after(MAINTENANCE_CHECK_MS, self.run_idle_maintenance)
+        
+        # Pick up writes made by other windows, scripts or imports
+        self.root.after(WATCH_INTERVAL_MS, self.watch_books)
+        
     def center_window(self):
         """Center the window on screen"""
         self.root.update_idletasks()
@@ -41,26 +1125,14 @@ class ContactManagementSystem:
         
     def init_database(self):
         """Initialize SQLite database"""
-        self.conn = sqlite3.connect('contacts.db', check_same_thread=False)
-        self.cursor = self.conn.cursor()
-        
-        # Create contacts table if not exists
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS contacts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                first_name TEXT NOT NULL,
-                last_name TEXT NOT NULL,
-                phone TEXT,
-                email TEXT,
-                address TEXT,
-                company TEXT,
-                notes TEXT,
-                category TEXT,
-                created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_modified TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        self.conn.commit()
+        # Every open contact book, the first one is always the default database
+        self.books = OrderedDict()
+        self.books[DEFAULT_BOOK_NAME] = ContactBook(DEFAULT_BOOK_NAME, DEFAULT_BOOK_PATH)
+        self.active_book = DEFAULT_BOOK_NAME
+        
+        # Lists and searches query every book in parallel
+        self.book_executor = ThreadPoolExecutor(max_workers=BOOK_SEARCH_WORKERS, 
+                                                thread_name_prefix="books")
     
     def setup_gui(self):
         """Setup the main GUI components"""
@@ -95,6 +1167,13 @@ class ContactManagementSystem:
                                               command=self.show_import_export)
         self.import_export_btn.grid(row=4, column=0, padx=20, pady=10)
         
+        # Book that new contacts, imports and resets apply to
+        self.book_menu = ctk.CTkOptionMenu(self.sidebar_frame, 
+                                          values=list(self.books),
+                                          command=self.change_active_book)
+        self.book_menu.set(self.active_book)
+        self.book_menu.grid(row=5, column=0, padx=20, pady=10)
+        
         # Appearance mode
         self.appearance_label = ctk.CTkLabel(self.sidebar_frame, text="Appearance Mode:", anchor="w")
         self.appearance_label.grid(row=7, column=0, padx=20, pady=(10, 0))
@@ -131,29 +1210,9 @@ class ContactManagementSystem:
         stats_frame = ctk.CTkFrame(self.dashboard_page)
         stats_frame.pack(pady=20, padx=20, fill="x")
         
-        # Get stats
-        total_contacts = self.get_total_contacts()
-        recent_contacts = self.get_recent_contacts()
-        categories_count = self.get_categories_count()
-        
-        stats_text = f"""
-        Welcome to Contact Management System!
-        
-        📈 Statistics:
-        • Total Contacts: {total_contacts}
-        • Recent Contacts (Last 7 days): {recent_contacts}
-        • Categories: {categories_count}
-        
-        🚀 Quick Actions:
-        • Add new contact
-        • View all contacts  
-        • Search contacts
-        • Import/Export data
-        """
-        
-        stats_label = ctk.CTkLabel(stats_frame, text=stats_text, 
-                                  font=ctk.CTkFont(size=14), justify="left")
-        stats_label.pack(pady=20, padx=20)
+        self.stats_label = ctk.CTkLabel(stats_frame, text=self.get_dashboard_text(), 
+                                       font=ctk.CTkFont(size=14), justify="left")
+        self.stats_label.pack(pady=20, padx=20)
         
         # Quick action buttons
         action_frame = ctk.CTkFrame(self.dashboard_page)
@@ -197,6 +1256,10 @@ class ContactManagementSystem:
                                         command=self.load_contacts)
         self.refresh_btn.pack(side="right", padx=10, pady=10)
         
+        self.fuzzy_switch = ctk.CTkSwitch(search_frame, text="Fuzzy", 
+                                         command=self.search_contacts)
+        self.fuzzy_switch.pack(side="right", padx=10, pady=10)
+        
         # Contacts table frame
         table_frame = ctk.CTkFrame(self.contacts_page)
         table_frame.pack(fill="both", expand=True, padx=20, pady=10)
@@ -204,23 +1267,34 @@ class ContactManagementSystem:
         # Create treeview with style
         style = ttk.Style()
         style.theme_use("clam")
+        style.configure("Treeview", rowheight=LIST_THUMBNAIL_SIZE[1] + 4)
+        
+        columns = ("ID", "Name", "Phone", "Email", "Company", "Category", "Book")
+        self.contacts_tree = ttk.Treeview(table_frame, columns=columns, show="tree headings", height=15)
         
-        columns = ("ID", "Name", "Phone", "Email", "Company", "Category")
-        self.contacts_tree = ttk.Treeview(table_frame, columns=columns, show="headings", height=15)
+        # Photo thumbnails go in the tree column
+        self.contacts_tree.heading("#0", text="Photo")
+        self.contacts_tree.column("#0", width=LIST_THUMBNAIL_SIZE[0] + 16, stretch=False)
+        self.row_photos = {}
+        self.row_books = {}
+        self.row_names = {}
+        self.book_items = {}
+        self.tree_images = OrderedDict()
+        self.thumbnails_pending = False
         
         # Configure columns
-        column_widths = {"ID": 50, "Name": 150, "Phone": 120, "Email": 200, "Company": 150, "Category": 100}
+        column_widths = {"ID": 50, "Name": 150, "Phone": 120, "Email": 200, "Company": 150, "Category": 100, "Book": 100}
         for col in columns:
             self.contacts_tree.heading(col, text=col)
             self.contacts_tree.column(col, width=column_widths[col])
         
         # Scrollbar
-        scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.contacts_tree.yview)
-        self.contacts_tree.configure(yscrollcommand=scrollbar.set)
+        self.contacts_scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.contacts_tree.yview)
+        self.contacts_tree.configure(yscrollcommand=self.on_contacts_scroll)
         
         # Pack treeview and scrollbar
         self.contacts_tree.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        self.contacts_scrollbar.pack(side="right", fill="y")
         
         # Bind double click event
         self.contacts_tree.bind("<Double-1>", self.on_contact_double_click)
@@ -285,6 +1359,28 @@ class ContactManagementSystem:
             entry.pack(side="left", padx=10, pady=5, fill="x", expand=True)
             self.entry_widgets[field] = entry
         
+        # Photo
+        photo_frame = ctk.CTkFrame(form_container)
+        photo_frame.pack(fill="x", padx=10, pady=8)
+        
+        photo_lbl = ctk.CTkLabel(photo_frame, text="Photo:", width=120, anchor="e")
+        photo_lbl.pack(side="left", padx=10, pady=5)
+        
+        # Transparent stand-in, CTkLabel cannot drop an image once it has one
+        self.photo_placeholder = ctk.CTkImage(Image.new("RGBA", FORM_THUMBNAIL_SIZE), 
+                                             size=FORM_THUMBNAIL_SIZE)
+        self.photo_preview = ctk.CTkLabel(photo_frame, text="No photo", image=self.photo_placeholder)
+        self.photo_preview.pack(side="left", padx=10, pady=5)
+        
+        ctk.CTkButton(photo_frame, text="📷 Choose Photo", 
+                     command=self.choose_photo).pack(side="left", padx=10)
+        ctk.CTkButton(photo_frame, text="Remove Photo", 
+                     command=self.remove_photo).pack(side="left", padx=10)
+        
+        self.photo_path = None
+        self.photo_digest = None
+        self.photo_source = None
+        
         # Address (text box)
         address_frame = ctk.CTkFrame(form_container)
         address_frame.pack(fill="x", padx=10, pady=8)
@@ -322,6 +1418,11 @@ class ContactManagementSystem:
         self.cancel_btn.pack(side="left", padx=10)
         
         self.editing_id = None
+        self.editing_book = None
+        
+        # Bumped whenever the form starts over, a save that lands later only
+        # touches the form if it still holds the contact that was saved
+        self.form_token = 0
     
     def create_import_export_page(self):
         """Create import/export page"""
@@ -388,6 +1489,22 @@ class ContactManagementSystem:
                      command=self.backup_database).pack(side="left", padx=10)
         ctk.CTkButton(db_btn_frame, text="🔄 Reset Database", 
                      command=self.reset_database, fg_color="#d13438").pack(side="left", padx=10)
+        
+        book_btn_frame = ctk.CTkFrame(db_frame)
+        book_btn_frame.pack(pady=10)
+        
+        ctk.CTkButton(book_btn_frame, text="📂 Open Contact Book", 
+                     command=self.open_book).pack(side="left", padx=10)
+        ctk.CTkButton(book_btn_frame, text="📕 Close Contact Book", 
+                     command=self.close_active_book).pack(side="left", padx=10)
+        
+        maintenance_btn_frame = ctk.CTkFrame(db_frame)
+        maintenance_btn_frame.pack(pady=10)
+        
+        ctk.CTkButton(maintenance_btn_frame, text="🩺 Check Database", 
+                     command=self.check_database).pack(side="left", padx=10)
+        ctk.CTkButton(maintenance_btn_frame, text="🧹 Optimize Now", 
+                     command=self.optimize_database).pack(side="left", padx=10)
     
     def show_dashboard(self):
         """Show dashboard page"""
@@ -422,72 +1539,237 @@ class ContactManagementSystem:
     
     def update_dashboard_stats(self):
         """Update dashboard statistics"""
-        total_contacts = self.get_total_contacts()
-        recent_contacts = self.get_recent_contacts()
-        categories_count = self.get_categories_count()
+        # The per-book counts follow change detection, catch up with anything not polled yet
+        self.collect_changes()
+        self.stats_label.configure(text=self.get_dashboard_text())
+    
+    def get_dashboard_text(self):
+        """Build the dashboard statistics text, with a line per book when several are open"""
+        # Get stats
+        book_stats = self.get_book_stats()
+        total_contacts = sum(stats['total'] for stats in book_stats.values())
+        recent_contacts = sum(stats['recent'] for stats in book_stats.values())
+        categories = set()
+        for stats in book_stats.values():
+            categories |= stats['categories']
+        categories_count = len(categories)
+        
+        book_lines = ""
+        if len(book_stats) > 1:
+            book_lines = "\n        📚 Contact Books:\n" + "".join(
+                f"        • {name}: {stats['total']} contacts, {stats['recent']} recent, "
+                f"{len(stats['categories'])} categories\n"
+                for name, stats in book_stats.items())
+        
+        return f"""
+        Welcome to Contact Management System!
         
-        # Update would be done when we refresh the dashboard
-        # For now, we'll just reload the dashboard
-        pass
+        📈 Statistics:
+        • Total Contacts: {total_contacts}
+        • Recent Contacts (Last 7 days): {recent_contacts}
+        • Categories: {categories_count}
+        {book_lines}
+        🚀 Quick Actions:
+        • Add new contact
+        • View all contacts  
+        • Search contacts
+        • Import/Export data
+        """
     
     def load_contacts(self):
         """Load contacts into treeview"""
         # Clear existing items
-        for item in self.contacts_tree.get_children():
-            self.contacts_tree.delete(item)
-        
-        # Fetch contacts from database
-        self.cursor.execute('''
-            SELECT id, first_name, last_name, phone, email, company, category 
-            FROM contacts 
-            ORDER BY first_name, last_name
-        ''')
-        contacts = self.cursor.fetchall()
+        self.clear_contacts_tree()
+        
+        # Changes still waiting for the watcher are covered by this reload, and any
+        # commit since the last poll also invalidates the search cache
+        self.collect_changes()
+        
+        # Fetch contacts from every book and merge them by name
+        contacts = self.merge_by_name(self.query_books(lambda book: book.list_contacts()))
         
         # Insert into treeview
-        for contact in contacts:
-            full_name = f"{contact[1]} {contact[2]}"
-            self.contacts_tree.insert("", "end", values=(
-                contact[0], full_name, contact[3] or "-", contact[4] or "-", 
-                contact[5] or "-", contact[6] or "-"
-            ))
+        self.insert_contact_rows(contacts)
         
         # Update status
         self.status_label.configure(text=f"Loaded {len(contacts)} contacts")
     
+    def query_books(self, query):
+        """Run query(book) for every open book in parallel and return the results in book order"""
+        books = list(self.books.values())
+        if len(books) == 1:
+            return [query(books[0])]
+        return list(self.book_executor.map(query, books))
+    
+    @staticmethod
+    def merge_by_name(results):
+        """Merge per-book row lists that are each sorted by first and last name"""
+        if len(results) == 1:
+            return results[0]
+        return list(heapq.merge(*results, key=lambda contact: (contact[1], contact[2])))
+    
+    def clear_contacts_tree(self):
+        """Remove every row from the contacts list"""
+        self.contacts_tree.delete(*self.contacts_tree.get_children())
+        self.row_photos.clear()
+        self.row_books.clear()
+        self.row_names.clear()
+        self.book_items.clear()
+        self.tree_images.clear()
+    
+    def insert_contact_rows(self, contacts):
+        """Append (id, first, last, phone, email, company, category, photo, book) rows to the list"""
+        for contact in contacts:
+            self.insert_contact_row(contact, "end")
+    
+    def insert_contact_row(self, contact, index):
+        """Insert one list row at index and remember where it came from"""
+        full_name = f"{contact[1]} {contact[2]}"
+        item = self.contacts_tree.insert("", index, values=(
+            contact[0], full_name, contact[3] or "-", contact[4] or "-", 
+            contact[5] or "-", contact[6] or "-", contact[8]
+        ))
+        self.row_books[item] = contact[8]
+        self.row_names[item] = (contact[1], contact[2])
+        self.book_items[(contact[8], contact[0])] = item
+        if contact[7]:
+            self.row_photos[item] = contact[7]
+    
+    def remove_contact_row(self, book_name, contact_id):
+        """Drop the list row of a contact if it is shown"""
+        item = self.book_items.pop((book_name, contact_id), None)
+        if item is None:
+            return
+        self.contacts_tree.delete(item)
+        self.row_books.pop(item, None)
+        self.row_names.pop(item, None)
+        self.row_photos.pop(item, None)
+    
+    def on_contacts_scroll(self, first, last):
+        """Keep the scrollbar in sync and load thumbnails for rows that came into view"""
+        self.contacts_scrollbar.set(first, last)
+        if not self.thumbnails_pending:
+            self.thumbnails_pending = True
+            self.root.after_idle(self.load_visible_thumbnails)
+    
+    def visible_contact_items(self):
+        """Yield the list rows currently on screen"""
+        item = self.contacts_tree.identify_row(0)
+        while item and self.contacts_tree.bbox(item):
+            yield item
+            item = self.contacts_tree.next(item)
+    
+    def load_visible_thumbnails(self):
+        """Request thumbnails for the rows currently on screen only"""
+        self.thumbnails_pending = False
+        for item in self.visible_contact_items():
+            digest = self.row_photos.get(item)
+            if not digest:
+                continue
+            photo = self.tree_images.get(digest)
+            if photo is not None:
+                self.tree_images.move_to_end(digest)
+                self.contacts_tree.item(item, image=photo)
+                continue
+            photos = self.books[self.row_books[item]].photos
+            self.thumbnail_cache.request(
+                photos.path(digest), LIST_THUMBNAIL_SIZE,
+                lambda image, digest=digest: self.show_row_thumbnail(digest, image),
+                photos.thumbnail_path(digest, LIST_THUMBNAIL_SIZE))
+    
+    def show_row_thumbnail(self, digest, image):
+        """Attach a decoded thumbnail to the visible rows that use it"""
+        if image is None:
+            # Missing or unreadable photo, the rows stay without an image
+            return
+        photo = self.tree_images.get(digest)
+        if photo is not None:
+            self.tree_images.move_to_end(digest)
+        else:
+            photo = self.tree_images[digest] = ImageTk.PhotoImage(image)
+            # Rows scrolled out of view may lose their image, it is re-attached from the LRU
+            while len(self.tree_images) > TREE_IMAGE_LIMIT:
+                self.tree_images.popitem(last=False)
+        for item in self.visible_contact_items():
+            if self.row_photos.get(item) == digest:
+                self.contacts_tree.item(item, image=photo)
+    
     def search_contacts(self, event=None):
         """Search contacts based on search term"""
         search_term = self.search_entry.get().lower()
         
         # Clear existing items
-        for item in self.contacts_tree.get_children():
-            self.contacts_tree.delete(item)
+        self.clear_contacts_tree()
         
         if not search_term:
             self.load_contacts()
             return
         
-        # Fetch and filter contacts
-        self.cursor.execute('''
-            SELECT id, first_name, last_name, phone, email, company, category 
-            FROM contacts 
-            WHERE LOWER(first_name) LIKE ? OR LOWER(last_name) LIKE ? OR phone LIKE ? OR LOWER(email) LIKE ? OR LOWER(company) LIKE ?
-            ORDER BY first_name, last_name
-        ''', (f'%{search_term}%', f'%{search_term}%', f'%{search_term}%', 
-              f'%{search_term}%', f'%{search_term}%'))
-        
-        contacts = self.cursor.fetchall()
+        if self.fuzzy_switch.get():
+            self.fuzzy_search_contacts(search_term)
+            return
         
-        for contact in contacts:
-            full_name = f"{contact[1]} {contact[2]}"
-            self.contacts_tree.insert("", "end", values=(
-                contact[0], full_name, contact[3] or "-", contact[4] or "-", 
-                contact[5] or "-", contact[6] or "-"
-            ))
+        contacts = self.find_contacts(search_term)
+        self.insert_contact_rows(contacts)
         
         # Update status
         self.status_label.configure(text=f"Found {len(contacts)} contacts matching '{search_term}'")
     
+    def find_contacts(self, search_term):
+        """Return the contacts of every book that contain search_term"""
+        # Reuse a cached result, or narrow a cached shorter term in memory
+        contacts = self.search_cache.get(search_term)
+        if contacts is None:
+            contacts = self.search_cache.refine(search_term)
+            if contacts is None:
+                # Fetch and filter contacts in every book
+                contacts = self.merge_by_name(
+                    self.query_books(lambda book: book.list_contacts(search_term)))
+            self.search_cache.put(search_term, contacts)
+        return contacts
+    
+    def fuzzy_search_contacts(self, search_term):
+        """Show contacts whose names or company are within a few typos of search_term"""
+        unindexed = [book for book in self.books.values() if not book.fuzzy_index.ready]
+        if unindexed:
+            # Plain matches stand in until every index is built, the search reruns then
+            for book in unindexed:
+                if book.fuzzy_build is None:
+                    self.build_fuzzy_index(book)
+            contacts = self.find_contacts(search_term)
+            self.insert_contact_rows(contacts)
+            self.status_label.configure(
+                text=f"Building fuzzy search index... {len(contacts)} contacts matching '{search_term}'")
+            return
+        
+        results = self.query_books(lambda book: book.fuzzy_contacts(search_term))
+        matches = heapq.nsmallest(FUZZY_MAX_RESULTS, (match for book_matches in results for match in book_matches),
+                                  key=lambda match: (match[0], match[1][1], match[1][2]))
+        contacts = [contact for _, contact in matches]
+        
+        self.insert_contact_rows(contacts)
+        
+        # Update status
+        self.status_label.configure(text=f"Found {len(contacts)} contacts similar to '{search_term}'")
+    
+    def build_fuzzy_index(self, book):
+        """Build the fuzzy index of book in the background and rerun the search once it is done"""
+        def built(index):
+            if self.books.get(book.name) is not book:
+                return
+            if not book.install_fuzzy_index(index):
+                # Rebuilt from scratch, the book changed wholesale while this one was built
+                self.build_fuzzy_index(book)
+                return
+            if self.fuzzy_switch.get() and self.search_entry.get():
+                self.search_contacts()
+        
+        def failed(error):
+            book.fuzzy_build = None
+            self.status_label.configure(text=f"❌ Failed to build fuzzy search index: {str(error)}")
+        
+        self.when_written(book.build_fuzzy_index(), built, failed)
+    
     def save_contact(self):
         """Save contact to database"""
         # Get form data
@@ -503,34 +1785,96 @@ class ContactManagementSystem:
             messagebox.showerror("Error", "First Name and Last Name are required!")
             return
         
-        try:
-            if self.editing_id:
+        # Edits stay in the contact's own book, new contacts go to the active one
+        book = self.books.get(self.editing_book or self.active_book)
+        if book is None:
+            messagebox.showerror("Error", "❌ The contact book of this contact has been closed!")
+            return
+        
+        editing_id = self.editing_id
+        keep_photo = self.photo_digest is not None
+        
+        # Photo bytes go to the file store before the write, only the digest is written
+        digest = None
+        if self.photo_path:
+            try:
+                digest = book.photos.add(self.photo_path)
+            except Exception as e:
+                messagebox.showerror("Photo Error", f"❌ Failed to store photo: {str(e)}")
+                return
+            self.thumbnail_cache.forget(book.photos.path(digest))
+        
+        def write(cursor):
+            if editing_id:
                 # Update existing contact
-                self.cursor.execute('''
+                cursor.execute('''
                     UPDATE contacts 
                     SET first_name=?, last_name=?, phone=?, email=?, address=?, 
                         company=?, notes=?, category=?, last_modified=?
                     WHERE id=?
                 ''', (data['first_name'], data['last_name'], data['phone'], 
                       data['email'], address, data['company'], notes, 
-                      data['category'], datetime.now(), self.editing_id))
-                messagebox.showinfo("Success", "✅ Contact updated successfully!")
+                      data['category'], datetime.now(), editing_id))
+                contact_id = editing_id
             else:
                 # Insert new contact
-                self.cursor.execute('''
+                cursor.execute('''
                     INSERT INTO contacts 
                     (first_name, last_name, phone, email, address, company, notes, category)
                     VALUES (?, ?, ?, ?, ?, ?, ?, ?)
                 ''', (data['first_name'], data['last_name'], data['phone'], 
                       data['email'], address, data['company'], notes, data['category']))
-                messagebox.showinfo("Success", "✅ Contact added successfully!")
+                contact_id = cursor.lastrowid
             
-            self.conn.commit()
-            self.clear_form()
-            self.show_contacts()
-            
-        except sqlite3.Error as e:
-            messagebox.showerror("Database Error", f"❌ Failed to save contact: {str(e)}")
+            if digest:
+                cursor.execute('INSERT OR REPLACE INTO contact_photos (contact_id, sha256) VALUES (?, ?)',
+                               (contact_id, digest))
+            elif editing_id and not keep_photo:
+                cursor.execute('DELETE FROM contact_photos WHERE contact_id=?', (contact_id,))
+            return contact_id
+        
+        form_token = self.form_token
+        
+        def saved(contact_id):
+            if digest:
+                book.photos.unpin(digest)
+            self.search_cache.invalidate()
+            book.index_contact(contact_id, data['first_name'], data['last_name'], data['company'])
+            # The user may have cancelled or moved on to another contact meanwhile,
+            # the watcher brings the saved row into the list then
+            if self.form_token == form_token:
+                self.save_btn.configure(state="normal")
+                if self.add_contact_page.winfo_ismapped():
+                    self.clear_form()
+                    self.show_contacts()
+            if editing_id:
+                self.status_label.configure(text="✅ Contact updated successfully!")
+            else:
+                self.status_label.configure(text="✅ Contact added successfully!")
+        
+        def failed(error):
+            if digest:
+                book.photos.unpin(digest)
+            if self.form_token == form_token:
+                self.save_btn.configure(state="normal")
+            messagebox.showerror("Database Error", f"❌ Failed to save contact: {str(error)}")
+        
+        # Saving runs on the writer thread, keep the form from submitting twice
+        self.save_btn.configure(state="disabled")
+        self.when_written(book.writer.submit(write), saved, failed)
+    
+    def when_written(self, future, on_success, on_error):
+        """Call on_success(result) or on_error(exception) on the Tk thread once future resolves"""
+        def check():
+            if not future.done():
+                self.root.after(WRITE_POLL_MS, check)
+                return
+            error = future.exception()
+            if error is None:
+                on_success(future.result())
+            else:
+                on_error(error)
+        self.root.after(WRITE_POLL_MS, check)
     
     def clear_form(self):
         """Clear the contact form"""
@@ -538,8 +1882,52 @@ class ContactManagementSystem:
             widget.delete(0, "end")
         self.address_text.delete("1.0", "end")
         self.notes_text.delete("1.0", "end")
+        self.photo_path = None
+        self.photo_digest = None
+        self.show_form_photo(None)
         self.editing_id = None
+        self.editing_book = None
         self.contact_form_title.configure(text="➕ Add New Contact")
+        
+        # A save still in flight belongs to the previous form
+        self.form_token += 1
+        self.save_btn.configure(state="normal")
+    
+    def choose_photo(self):
+        """Pick an image file for the contact in the form"""
+        filename = filedialog.askopenfilename(
+            filetypes=[("Images", "*.png *.jpg *.jpeg *.gif *.bmp *.webp"), ("All files", "*.*")],
+            title="Choose contact photo"
+        )
+        if filename:
+            self.photo_path = filename
+            self.thumbnail_cache.forget(filename)
+            self.show_form_photo(filename)
+    
+    def remove_photo(self):
+        """Drop the photo of the contact in the form"""
+        self.photo_path = None
+        self.photo_digest = None
+        self.show_form_photo(None)
+    
+    def show_form_photo(self, source_path, cache_path=None):
+        """Preview source_path in the form once its thumbnail is decoded"""
+        self.photo_source = source_path
+        self.photo_preview.configure(image=self.photo_placeholder, text="No photo" if source_path is None else "Loading...")
+        if source_path is None:
+            return
+        
+        def loaded(image):
+            # The form may have moved on to another photo meanwhile
+            if self.photo_source != source_path:
+                return
+            if image is None:
+                self.photo_preview.configure(text="No photo")
+                return
+            preview = ctk.CTkImage(light_image=image, dark_image=image, size=image.size)
+            self.photo_preview.configure(image=preview, text="")
+        
+        self.thumbnail_cache.request(source_path, FORM_THUMBNAIL_SIZE, loaded, cache_path)
     
     def on_contact_double_click(self, event):
         """Handle double click on contact"""
@@ -553,15 +1941,17 @@ class ContactManagementSystem:
             return
         
         contact_id = self.contacts_tree.item(selected_item[0])['values'][0]
+        book = self.books[self.row_books[selected_item[0]]]
         
         # Fetch contact details
-        self.cursor.execute('SELECT * FROM contacts WHERE id=?', (contact_id,))
-        contact = self.cursor.fetchone()
+        book.cursor.execute('SELECT * FROM contacts WHERE id=?', (contact_id,))
+        contact = book.cursor.fetchone()
         
         if contact:
             self.show_add_contact()
             self.contact_form_title.configure(text="✏️ Edit Contact")
             self.editing_id = contact_id
+            self.editing_book = book.name
             
             # Fill form with contact data
             self.entry_widgets['first_name'].insert(0, contact[1])
@@ -575,6 +1965,13 @@ class ContactManagementSystem:
                 self.address_text.insert("1.0", contact[5])
             if contact[7]:
                 self.notes_text.insert("1.0", contact[7])
+            
+            book.cursor.execute('SELECT sha256 FROM contact_photos WHERE contact_id=?', (contact_id,))
+            photo = book.cursor.fetchone()
+            if photo:
+                self.photo_digest = photo[0]
+                self.show_form_photo(book.photos.path(photo[0]),
+                                     book.photos.thumbnail_path(photo[0], FORM_THUMBNAIL_SIZE))
     
     def delete_contact(self):
         """Delete selected contact"""
@@ -585,22 +1982,32 @@ class ContactManagementSystem:
         
         contact_name = self.contacts_tree.item(selected_item[0])['values'][1]
         contact_id = self.contacts_tree.item(selected_item[0])['values'][0]
+        book = self.books[self.row_books[selected_item[0]]]
         
         if messagebox.askyesno("Confirm Delete", 
                              f"Are you sure you want to delete '{contact_name}'?"):
-            try:
-                self.cursor.execute('DELETE FROM contacts WHERE id=?', (contact_id,))
-                self.conn.commit()
-                messagebox.showinfo("Success", "✅ Contact deleted successfully!")
+            def write(cursor):
+                cursor.execute('DELETE FROM contact_photos WHERE contact_id=?', (contact_id,))
+                cursor.execute('DELETE FROM contacts WHERE id=?', (contact_id,))
+            
+            def deleted(_):
+                self.search_cache.invalidate()
+                book.unindex_contact(contact_id)
                 self.load_contacts()
-            except sqlite3.Error as e:
-                messagebox.showerror("Database Error", f"❌ Failed to delete contact: {str(e)}")
+                self.status_label.configure(text="✅ Contact deleted successfully!")
+            
+            def failed(error):
+                messagebox.showerror("Database Error", f"❌ Failed to delete contact: {str(error)}")
+            
+            self.when_written(book.writer.submit(write), deleted, failed)
     
     def export_contacts(self):
         """Export all contacts to CSV"""
         try:
-            self.cursor.execute('SELECT * FROM contacts')
-            contacts = self.cursor.fetchall()
+            contacts = []
+            for book in self.books.values():
+                book.cursor.execute('SELECT * FROM contacts')
+                contacts.extend(self.export_rows(book, book.cursor.fetchall()))
             
             if not contacts:
                 messagebox.showinfo("Info", "ℹ️ No contacts to export!")
@@ -616,8 +2023,7 @@ class ContactManagementSystem:
                 with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
                     writer = csv.writer(csvfile)
                     # Write header
-                    writer.writerow(['ID', 'First Name', 'Last Name', 'Phone', 'Email', 
-                                   'Address', 'Company', 'Notes', 'Category', 'Created Date'])
+                    writer.writerow(self.export_header())
                     
                     # Write data
                     for contact in contacts:
@@ -636,11 +2042,18 @@ class ContactManagementSystem:
             return
         
         try:
-            contact_ids = [self.contacts_tree.item(item)['values'][0] for item in selected_items]
-            placeholders = ','.join('?' for _ in contact_ids)
+            # Selected rows may come from several books
+            selected_ids = {}
+            for item in selected_items:
+                selected_ids.setdefault(self.row_books[item], []).append(
+                    self.contacts_tree.item(item)['values'][0])
             
-            self.cursor.execute(f'SELECT * FROM contacts WHERE id IN ({placeholders})', contact_ids)
-            contacts = self.cursor.fetchall()
+            contacts = []
+            for book_name, contact_ids in selected_ids.items():
+                book = self.books[book_name]
+                placeholders = ','.join('?' for _ in contact_ids)
+                book.cursor.execute(f'SELECT * FROM contacts WHERE id IN ({placeholders})', contact_ids)
+                contacts.extend(self.export_rows(book, book.cursor.fetchall()))
             
             filename = filedialog.asksaveasfilename(
                 defaultextension=".csv",
@@ -652,8 +2065,7 @@ class ContactManagementSystem:
                 with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
                     writer = csv.writer(csvfile)
                     # Write header
-                    writer.writerow(['ID', 'First Name', 'Last Name', 'Phone', 'Email', 
-                                   'Address', 'Company', 'Notes', 'Category', 'Created Date'])
+                    writer.writerow(self.export_header())
                     
                     # Write data
                     for contact in contacts:
@@ -664,6 +2076,20 @@ class ContactManagementSystem:
         except Exception as e:
             messagebox.showerror("Export Error", f"❌ Failed to export contacts: {str(e)}")
     
+    def export_header(self):
+        """CSV header row, with a Book column once more than one book is open"""
+        header = ['ID', 'First Name', 'Last Name', 'Phone', 'Email', 
+                  'Address', 'Company', 'Notes', 'Category', 'Created Date']
+        if len(self.books) > 1:
+            header.append('Book')
+        return header
+    
+    def export_rows(self, book, contacts):
+        """Tag exported rows with their book name once more than one book is open"""
+        if len(self.books) > 1:
+            return [contact + (book.name,) for contact in contacts]
+        return contacts
+    
     def export_detailed_contacts(self):
         """Export contacts with detailed information"""
         self.export_contacts()  # Same as regular export for now
@@ -679,18 +2105,16 @@ class ContactManagementSystem:
             if not filename:
                 return
             
+            # Imported contacts go to the active book
+            book = self.books[self.active_book]
+            
             with open(filename, 'r', encoding='utf-8') as csvfile:
                 reader = csv.DictReader(csvfile)
-                imported_count = 0
+                rows = []
                 
                 for row in reader:
                     try:
-                        # Insert contact
-                        self.cursor.execute('''
-                            INSERT INTO contacts 
-                            (first_name, last_name, phone, email, address, company, notes, category)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                        ''', (
+                        rows.append((
                             row.get('first_name', '').strip(),
                             row.get('last_name', '').strip(),
                             row.get('phone', '').strip(),
@@ -700,61 +2124,317 @@ class ContactManagementSystem:
                             row.get('notes', '').strip(),
                             row.get('category', '').strip()
                         ))
-                        imported_count += 1
                     except Exception as e:
                         print(f"Error importing row {row}: {e}")
                         continue
-                
-                self.conn.commit()
-                messagebox.showinfo("Success", f"✅ Successfully imported {imported_count} contacts!")
+            
+            def write(cursor):
+                imported = []
+                for values in rows:
+                    try:
+                        # Insert contact
+                        cursor.execute('''
+                            INSERT INTO contacts 
+                            (first_name, last_name, phone, email, address, company, notes, category)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                        ''', values)
+                        imported.append((cursor.lastrowid, values[0], values[1], values[5]))
+                    except sqlite3.IntegrityError as e:
+                        print(f"Error importing row {values}: {e}")
+                        continue
+                return imported
+            
+            def imported(contacts):
+                self.search_cache.invalidate()
+                for contact in contacts:
+                    book.index_contact(*contact)
+                messagebox.showinfo("Success", f"✅ Successfully imported {len(contacts)} contacts into '{book.name}'!")
                 self.load_contacts()
+            
+            def failed(error):
+                messagebox.showerror("Import Error", f"❌ Failed to import contacts: {str(error)}")
+            
+            self.when_written(book.writer.submit(write), imported, failed)
                 
         except Exception as e:
             messagebox.showerror("Import Error", f"❌ Failed to import contacts: {str(e)}")
     
     def backup_database(self):
-        """Create a backup of the database"""
+        """Create a backup of every open contact book"""
         try:
-            backup_filename = f"contacts_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
+            # Each book gets its own backup file next to it
+            backup_filenames = [book.backup() for book in self.books.values()]
             
-            # Simple file copy for backup
-            import shutil
-            shutil.copy2('contacts.db', backup_filename)
-            
-            messagebox.showinfo("Success", f"✅ Database backed up successfully as:\n{backup_filename}")
+            messagebox.showinfo("Success", "✅ Database backed up successfully as:\n" + "\n".join(backup_filenames))
             
         except Exception as e:
             messagebox.showerror("Backup Error", f"❌ Failed to backup database: {str(e)}")
     
     def reset_database(self):
-        """Reset the database (delete all contacts)"""
+        """Reset the active contact book (delete all its contacts)"""
+        book = self.books[self.active_book]
         if messagebox.askyesno("Confirm Reset", 
-                             "⚠️ This will delete ALL contacts! Are you sure?"):
-            try:
-                self.cursor.execute('DELETE FROM contacts')
-                self.conn.commit()
+                             f"⚠️ This will delete ALL contacts in '{book.name}'! Are you sure?"):
+            def reset(_):
+                self.search_cache.invalidate()
+                book.clear_fuzzy_index()
+                # Hand the dropped tables' pages back to the file system
+                self.start_maintenance(book, False)
                 messagebox.showinfo("Success", "✅ Database reset successfully!")
                 self.load_contacts()
-            except Exception as e:
-                messagebox.showerror("Reset Error", f"❌ Failed to reset database: {str(e)}")
-    
-    def get_total_contacts(self):
-        """Get total number of contacts"""
-        self.cursor.execute('SELECT COUNT(*) FROM contacts')
-        return self.cursor.fetchone()[0]
-    
-    def get_recent_contacts(self):
-        """Get number of contacts added in last 7 days"""
-        self.cursor.execute('''
-            SELECT COUNT(*) FROM contacts 
-            WHERE created_date >= datetime('now', '-7 days')
-        ''')
-        return self.cursor.fetchone()[0]
+            
+            def failed(error):
+                messagebox.showerror("Reset Error", f"❌ Failed to reset database: {str(error)}")
+            
+            self.when_written(book.writer.submit(book.reset), reset, failed)
+    
+    def get_book_stats(self):
+        """Get statistics of every open book, collected in parallel"""
+        return dict(zip(self.books, self.query_books(lambda book: book.stats())))
+    
+    def change_active_book(self, book_name):
+        """Select the book that new contacts, imports and resets apply to"""
+        self.active_book = book_name
+    
+    def open_book(self):
+        """Open an existing contact book or create a new one"""
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".db",
+            filetypes=[("Contact books", "*.db"), ("All files", "*.*")],
+            title="Open or create contact book",
+            confirmoverwrite=False
+        )
+        if not filename:
+            return
+        
+        for book in self.books.values():
+            if os.path.abspath(book.path) == os.path.abspath(filename):
+                messagebox.showinfo("Info", f"ℹ️ This contact book is already open as '{book.name}'!")
+                return
+        
+        # Name books after their file, numbering duplicates
+        base_name = os.path.splitext(os.path.basename(filename))[0]
+        book_name = base_name
+        suffix = 2
+        while book_name in self.books:
+            book_name = f"{base_name} ({suffix})"
+            suffix += 1
+        
+        try:
+            self.books[book_name] = ContactBook(book_name, filename)
+        except sqlite3.Error as e:
+            messagebox.showerror("Database Error", f"❌ Failed to open contact book: {str(e)}")
+            return
+        
+        self.active_book = book_name
+        self.books_changed()
+    
+    def close_active_book(self):
+        """Close the active contact book, the default book always stays open"""
+        if self.active_book == DEFAULT_BOOK_NAME:
+            messagebox.showwarning("Warning", "⚠️ The main contact book cannot be closed!")
+            return
+        
+        book = self.books.pop(self.active_book)
+        self.active_book = DEFAULT_BOOK_NAME
+        self.books_changed()
+        
+        def closed(_):
+            self.status_label.configure(text=f"✅ Contact book '{book.name}' closed")
+        
+        def failed(error):
+            messagebox.showerror("Database Error", f"❌ Failed to close contact book: {str(error)}")
+        
+        # Pending writes may wait on a locked database, finish them off the Tk thread
+        self.when_written(self.book_executor.submit(book.close), closed, failed)
     
-    def get_categories_count(self):
-        """Get number of unique categories"""
-        self.cursor.execute('SELECT COUNT(DISTINCT category) FROM contacts WHERE category IS NOT NULL AND category != ""')
-        return self.cursor.fetchone()[0]
+    def books_changed(self):
+        """Refresh everything that lists or merges the open books"""
+        self.book_menu.configure(values=list(self.books))
+        self.book_menu.set(self.active_book)
+        self.search_cache.invalidate()
+        self.load_contacts()
+        self.update_dashboard_stats()
+    
+    def watch_books(self):
+        """Apply contacts changed by other connections to the list and dashboard"""
+        self.root.after(WATCH_INTERVAL_MS, self.watch_books)
+        
+        changes = self.collect_changes()
+        if not changes:
+            return
+        
+        if self.contacts_page.winfo_ismapped():
+            search_term = self.search_entry.get().lower()
+            if (any(result == RELOAD_ALL for result in changes.values()) or 
+                    (search_term and (self.fuzzy_switch.get() or '%' in search_term or '_' in search_term))):
+                # Full reloads, ranked fuzzy results and LIKE wildcards go through the normal path
+                self.search_contacts()
+            else:
+                for book, (rows, deleted_ids) in changes.items():
+                    if search_term:
+                        # Changed rows that no longer match leave the results like deleted ones
+                        matching = [row for row in rows if SearchCache.row_matches(row, search_term)]
+                        deleted_ids = set(deleted_ids) | {row[0] for row in rows} - {row[0] for row in matching}
+                        rows = matching
+                    self.apply_contact_changes(book, rows, deleted_ids)
+        else:
+            # Shown again through show_contacts, which reloads anyway
+            self.clear_contacts_tree()
+        
+        if self.dashboard_page.winfo_ismapped():
+            self.update_dashboard_stats()
+    
+    def collect_changes(self):
+        """Poll every book for outside changes and bring the caches up to date"""
+        changes = {}
+        for book in self.books.values():
+            try:
+                result = book.poll_changes()
+            except sqlite3.Error as e:
+                print(f"Change detection for {book.name} failed: {e}")
+                continue
+            if result is not None:
+                changes[book] = result
+        if not changes:
+            return changes
+        
+        self.search_cache.invalidate()
+        for book, result in changes.items():
+            if result == RELOAD_ALL:
+                book.contact_stats.ready = False
+                # Searches keep using the current index while a fresh one is built
+                if book.fuzzy_build is not None:
+                    book.fuzzy_stale = True
+                elif book.fuzzy_index.ready:
+                    self.build_fuzzy_index(book)
+                continue
+            rows, deleted_ids = result
+            for contact_id in deleted_ids:
+                book.unindex_contact(contact_id)
+            for contact in rows:
+                book.index_contact(contact[0], contact[1], contact[2], contact[5])
+            book.update_stats([contact[0] for contact in rows] + list(deleted_ids))
+        return changes
+    
+    def apply_contact_changes(self, book, rows, deleted_ids):
+        """Patch changed rows of book into the full, name-sorted contact list"""
+        # Updated rows are re-inserted, which keeps the list sorted when a name changed
+        for contact_id in deleted_ids:
+            self.remove_contact_row(book.name, contact_id)
+        for contact in rows:
+            self.remove_contact_row(book.name, contact[0])
+        
+        children = self.contacts_tree.get_children()
+        positions = []
+        for contact in rows:
+            key = (contact[1], contact[2])
+            low, high = 0, len(children)
+            while low < high:
+                middle = (low + high) // 2
+                if self.row_names[children[middle]] <= key:
+                    low = middle + 1
+                else:
+                    high = middle
+            positions.append((low, key, contact))
+        
+        # Insert from the bottom up so earlier positions stay valid
+        positions.sort(key=lambda position: (position[0], position[1]), reverse=True)
+        for index, _, contact in positions:
+            self.insert_contact_row(contact, index)
+        
+        self.status_label.configure(
+            text=f"🔄 {len(rows) + len(deleted_ids)} contacts updated from '{book.name}'")
+        self.load_visible_thumbnails()
+    
+    def note_activity(self, event=None):
+        """Remember when the user last interacted with the window"""
+        self.last_activity = time.monotonic()
+    
+    def run_idle_maintenance(self):
+        """Vacuum, optimize and analyze books nobody has touched for a while"""
+        self.root.after(MAINTENANCE_CHECK_MS, self.run_idle_maintenance)
+        if time.monotonic() - self.last_activity < MAINTENANCE_IDLE_SECONDS:
+            return
+        
+        for book in self.books.values():
+            if book.maintenance_pending or book.writer.idle_for() < MAINTENANCE_IDLE_SECONDS:
+                continue
+            # Nothing was written, here or by another process, since the last pass,
+            # and no unused photo is waiting for its grace period to end
+            if book.maintained_seq == book.change_seq and (
+                    book.prune_due is None or time.monotonic() < book.prune_due):
+                continue
+            analyze = (book.last_analyze is None or 
+                       time.monotonic() - book.last_analyze >= ANALYZE_INTERVAL_SECONDS)
+            self.start_maintenance(book, analyze)
+    
+    def start_maintenance(self, book, analyze, on_done=None):
+        """Queue a maintenance pass on the writer thread of book"""
+        book.maintenance_pending = True
+        change_seq = book.change_seq
+        
+        def done(stats):
+            book.maintenance_pending = False
+            book.maintained_seq = change_seq
+            book.prune_due = (time.monotonic() + PHOTO_PRUNE_GRACE_SECONDS 
+                              if stats['photos_deferred'] else None)
+            book.last_maintenance = (datetime.now(), stats)
+            if analyze:
+                book.last_analyze = time.monotonic()
+            if on_done:
+                on_done(stats)
+        
+        def failed(error):
+            book.maintenance_pending = False
+            print(f"Maintenance of {book.name} failed: {error}")
+        
+        future = book.writer.submit_maintenance(lambda cursor: book.maintain(cursor, analyze))
+        self.when_written(future, done, failed)
+    
+    def check_database(self):
+        """Run quick_check on every book and show storage statistics"""
+        books = list(self.books.values())
+        
+        def checked(results):
+            report = "\n\n".join(self.format_storage_report(book, stats) 
+                                  for book, stats in zip(books, results))
+            if all(stats['quick_check'] == ['ok'] for stats in results):
+                messagebox.showinfo("Database Check", f"✅ All contact books are healthy\n\n{report}")
+            else:
+                messagebox.showwarning("Database Check", f"⚠️ Problems were found\n\n{report}")
+        
+        def failed(error):
+            messagebox.showerror("Database Check", f"❌ Failed to check database: {str(error)}")
+        
+        # Read-only, so it stays off the writer threads and runs on a worker instead
+        self.when_written(self.book_executor.submit(lambda: [book.check() for book in books]),
+                          checked, failed)
+    
+    def optimize_database(self):
+        """Run a full maintenance pass (incremental vacuum, ANALYZE) on every book now"""
+        for book in self.books.values():
+            if book.maintenance_pending:
+                continue
+            self.start_maintenance(book, True, lambda stats, book=book: messagebox.showinfo(
+                "Optimize", f"✅ Optimized\n\n{self.format_storage_report(book, stats)}"))
+    
+    @staticmethod
+    def format_storage_report(book, stats):
+        """Describe the storage statistics of a book for a message box"""
+        lines = [
+            f"📚 {book.name} ({book.path})",
+            f"• Size: {stats['size_bytes'] / 1024:.0f} KB in {stats['page_count']} pages",
+            f"• Free pages: {stats['freelist_count']} ({stats['free_ratio']:.1%})",
+            f"• Auto-vacuum: {stats['auto_vacuum']}",
+        ]
+        if stats.get('fragmentation') is not None:
+            lines.append(f"• Fragmentation: {stats['fragmentation']:.1%}")
+        if 'quick_check' in stats:
+            lines.append(f"• Integrity: {', '.join(stats['quick_check'][:5])}")
+        if book.last_maintenance:
+            lines.append(f"• Last maintenance: {book.last_maintenance[0].strftime('%Y-%m-%d %H:%M')}")
+        return "\n".join(lines)
     
     def change_appearance_mode(self, new_appearance_mode):
         """Change appearance mode"""
@@ -763,11 +2443,20 @@ class ContactManagementSystem:
     def run(self):
         """Run the application"""
         self.root.mainloop()
+        self.thumbnail_cache.close()
+        self.close_books()
+    
+    def close_books(self):
+        """Close every open contact book"""
+        while self.books:
+            _, book = self.books.popitem()
+            book.close()
+        self.book_executor.shutdown(wait=False)
     
     def __del__(self):
         """Close database connection"""
-        if hasattr(self, 'conn'):
-            self.conn.close()
+        if hasattr(self, 'books'):
+            self.close_books()
 
 if __name__ == "__main__":
     app = ContactManagementSystem()